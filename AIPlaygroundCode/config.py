@@ -110,7 +110,10 @@ Always maintain customer confidentiality and follow enterprise data handling pol
                 if field_type == bool:
                     # Handle checkbox values (can be 'on', '1', True, etc.)
                     setattr(self, key, value in ['on', '1', 'true', True, 1])
-                elif field_type in [int, float]:
+                elif field_type in (int, float):
+                    if isinstance(value, field_type):
+                        setattr(self, key, value)  # Already parsed (e.g. by the settings form)
+                        continue
                     try:
                         setattr(self, key, field_type(value) if value else getattr(self, key))
                     except (ValueError, TypeError):
@@ -120,8 +123,6 @@ Always maintain customer confidentiality and follow enterprise data handling pol
     
     def is_azure_configured(self) -> bool:
         """Check if Azure configuration is complete."""
-        import os
-        
         # Check if using managed identity
         is_managed_identity = os.getenv('AZURE_CLIENT_ID') == 'system-assigned-managed-identity'
         
@@ -660,6 +661,9 @@ class AppConfig:
         self.session_timeout = config.session_timeout
         self.log_level = config.log_level
         
+        # Optional server-side session store (cookie sessions when unset)
+        self.session_redis_url = os.getenv('SESSION_REDIS_URL', '')
+        
         # Allowed file extensions
         self.allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'mp3', 'wav', 'mp4', 'webm', 'ogg'}
     
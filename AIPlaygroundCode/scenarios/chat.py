@@ -6,7 +6,7 @@ Basic conversational AI using Azure AI Foundry following Microsoft's recommended
 
 from typing import List, Dict
 from ..utils.azure_client import get_azure_client
-from ..utils.helpers import get_conversation_history
+from ..utils.helpers import get_conversation_history, get_conversation_summary
 from ..config import get_model_config
 
 # Import OpenAI SDK if available
@@ -67,6 +67,11 @@ def build_chat_messages(user_message: str) -> List[Dict[str, str]]:
         }
     ]
     
+    # Add the summary of older turns that no longer fit in the session
+    summary = get_conversation_summary()
+    if summary:
+        messages.append({"role": "system", "content": summary})
+    
     # Add conversation history (last 10 messages)
     conversation_history = get_conversation_history()[-10:]
     messages.extend(conversation_history)
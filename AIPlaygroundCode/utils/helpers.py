@@ -4,16 +4,225 @@ Common helper functions for the AI chatbot application.
 
 import os
 import logging
+import atexit
+import queue
+import re
+import sys
 import json
 import zlib
-import base64
-from typing import Optional, List, Dict
+import threading
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from base64 import b85encode, b85decode
+from typing import Optional, List, Dict, Tuple
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
-from flask import session
+from flask import session, g, current_app, has_request_context
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Use SIMD-accelerated base64 when available (identical wire format to stdlib);
+# only needed to read frames written before the switch to base85
+try:
+    from pybase64 import b64decode as _b64decode
+except ImportError:
+    from base64 import b64decode as _b64decode
+
+# Use orjson for conversation serialization when available (stdlib json otherwise)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Use msgpack for the inner conversation encoding when available (JSON otherwise)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# SDK exception types used to classify errors (both SDKs are optional here)
+_AUTH_ERROR_TYPES: Tuple[type, ...] = ()
+_NOT_FOUND_ERROR_TYPES: Tuple[type, ...] = ()
+try:
+    import openai
+    _AUTH_ERROR_TYPES += (openai.AuthenticationError,)
+    _NOT_FOUND_ERROR_TYPES += (openai.NotFoundError,)
+except ImportError:
+    pass
+try:
+    from azure.core.exceptions import ClientAuthenticationError, ResourceNotFoundError
+    _AUTH_ERROR_TYPES += (ClientAuthenticationError,)
+    _NOT_FOUND_ERROR_TYPES += (ResourceNotFoundError,)
+except ImportError:
+    pass
+
+# Use zstd with a conversation dictionary when available (zlib otherwise)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Leading bytes marking the payload format; legacy zlib streams always start with 0x78
+_ZSTD_FORMAT = b'\x02'
+_ZLIB_DICT_FORMAT = b'\x03'
+_ZSTD_MSGPACK_FORMAT = b'\x04'
+_ZLIB_DICT_MSGPACK_FORMAT = b'\x05'
+_RAW_FORMAT = b'\x06'
+_RAW_MSGPACK_FORMAT = b'\x07'
+_MSGPACK_FORMATS = (_ZSTD_MSGPACK_FORMAT, _ZLIB_DICT_MSGPACK_FORMAT, _RAW_MSGPACK_FORMAT)
+
+# Payloads this small are stored uncompressed - codec overhead outweighs any saving
+_MIN_COMPRESS_BYTES = 24
+
+# Leading character of base85 session text; '~' never occurs in base64 output, so it cannot be mistaken for a base64 frame
+_B85_TAG = '~'
+
+# Roles are packed as small integers in msgpack payloads
+_ROLE_CODES = {'user': 0, 'assistant': 1}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+# Raw-content dictionary (zstd) / preset dictionary (zlib) seeded with the
+# fragments every conversation repeats, most frequent last so they get the
+# shortest back-references. Message text is stored verbatim in msgpack
+# payloads, so their dictionary holds content markers only
+_CONTENT_DICT = ''.join((
+    '*[Response continued but truncated to manage session size]*',
+    '*[Content lightly truncated for session efficiency]*',
+    '[image data removed]',
+    '**Status**: ',
+    '**AI Analysis**: ',
+    '**Transcription**: ',
+    '**Request**: ',
+    '**File**: ',
+    '**Audio Processing Complete**',
+    'Zava',
+)).encode('utf-8')
+
+# JSON payloads also repeat the message framing between contents
+_JSON_CONVERSATION_DICT = _CONTENT_DICT + ''.join((
+    '"},{"role":"assistant","content":"',
+    '"},{"role":"user","content":"',
+    '[{"role":"user","content":"',
+)).encode('utf-8')
+
+_zstd_local = threading.local()
+
+# Session keys that can hold conversation history, newest format first
+_HISTORY_KEYS = ('conversation_compressed', 'conversation')
+
+# Precompiled multimodal indicators - one case-insensitive pass per check
+# instead of lowercasing the content and scanning once per indicator
+_MULTIMODAL_RE = re.compile(
+    '|'.join(map(re.escape, ['🎤 **audio', '🖼️ **image', 'data:image', 'input_audio'])),
+    re.IGNORECASE
+)
+_ANALYZED_IMAGE_RE = re.compile(re.escape('analyzed the image'), re.IGNORECASE)
+_IMAGE_CONTENT_RE = re.compile(
+    '|'.join(map(re.escape, ['🖼️ **image', 'analyzed the image', 'image analysis'])),
+    re.IGNORECASE
+)
+_AUDIO_HEADER_RE = re.compile(
+    '|'.join(map(re.escape, ['**file**:', '**request**:', '**transcription**:', '**ai analysis**:', '**status**:'])),
+    re.IGNORECASE
+)
+_TRANSCRIPTION_HEADER_RE = re.compile(re.escape('**transcription**:'), re.IGNORECASE)
+
+# Line prefixes for compressing audio responses (str.startswith accepts a tuple)
+_FILE_REQ_PREFIXES = ('**File**:', '**Request**:')
+_TRANSCRIPTION_PREFIXES = ('**Transcription**:', '**📝 Transcription**:')
+_ANALYSIS_PREFIXES = ('**AI Analysis**:', '**🧠 AI Analysis**:')
+_STATUS_PREFIXES = ('✅ **Audio processed', '**Status**:', 'Audio processed using')
+
+# Truncation markers appended to shortened content
+_TRUNC_SUFFIX = "...\n\n*[Response continued but truncated to manage session size]*"
+_OVERSIZED_SUFFIX = "..\n\n*[Response truncated - message too large for session storage]*"
+_LIGHT_TRUNC_SUFFIX = '..\n\n*[Content lightly truncated for session efficiency]*'
+_AUDIO_OPTIMIZED_SUFFIX = '\n\n*[Audio response optimized for session storage]*'
+_RESPONSE_COMPRESSED_SUFFIX = '\n\n*[Response compressed for session efficiency]*'
+_IMAGE_COMPRESSED_SUFFIX = '\n\n*[Image analysis compressed]*'
+_FULL_TRANSCRIPTION_SUFFIX = '...[full transcription available]'
+_TRANSCRIPTION_CONTINUES_SUFFIX = '...[transcription continues]'
+_ANALYSIS_CONTINUES_SUFFIX = '...[analysis continues]'
+_IMAGE_CONTINUES_SUFFIX = '...[image analysis continues]'
+_MESSAGE_TRUNCATED_SUFFIX = '...[message truncated]'
+
+# Copy buffer for saving uploads (werkzeug defaults to 16KB chunks)
+_UPLOAD_BUFFER_SIZE = 1 << 20
+
+# Maximum user message length (after stripping surrounding whitespace)
+_MAX_MESSAGE_LENGTH = 4000
+
+# Evicted user turns are folded into a short extractive summary of earlier context
+_SUMMARY_TURN_CHARS = 80
+_SUMMARY_MAX_CHARS = 240
+
+# Session bytes reserved for the stored summary on top of the history budget,
+# so keeping a summary never evicts recent turns
+_SUMMARY_RESERVE = 256
+
+# Messages kept when sessions are server-side (no cookie size limit applies)
+_SERVER_SESSION_MAX_MESSAGES = 50
+
+# Approximate size of the session wrapper and bookkeeping keys around the
+# compressed conversation
+_SESSION_FIXED_OVERHEAD = 100
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize an object to compact UTF-8 encoded JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Deserialize UTF-8 encoded JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _pack_conversation(conversation: List[Dict[str, str]]) -> bytes:
+    """Pack messages with msgpack as a flat [role, content, ...] array, known roles as integers."""
+    flat = []
+    for message in conversation:
+        flat.append(_ROLE_CODES.get(message['role'], message['role']))
+        flat.append(message['content'])
+    return msgpack.packb(flat, use_bin_type=True)
+
+
+def _unpack_conversation(data: bytes) -> List[Dict[str, str]]:
+    """Inverse of _pack_conversation."""
+    flat = msgpack.unpackb(data, raw=False)
+    return [
+        {'role': _ROLE_NAMES.get(flat[i], flat[i]), 'content': flat[i + 1]}
+        for i in range(0, len(flat) - 1, 2)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _debug_mode() -> bool:
+    """Whether FLASK_DEBUG is enabled (read once - env vars don't change for a running worker)."""
+    return os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+
+
+def _zstd_contexts(zdict: bytes) -> Tuple['zstandard.ZstdCompressor', 'zstandard.ZstdDecompressor']:
+    """Return this thread's zstd compressor/decompressor pair for a dictionary (contexts are not thread-safe)."""
+    contexts = getattr(_zstd_local, 'contexts', None)
+    if contexts is None:
+        contexts = _zstd_local.contexts = {}
+    if zdict not in contexts:
+        zstd_dict = zstandard.ZstdCompressionDict(zdict, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+        contexts[zdict] = (
+            zstandard.ZstdCompressor(level=3, dict_data=zstd_dict),
+            zstandard.ZstdDecompressor(dict_data=zstd_dict)
+        )
+    return contexts[zdict]
+
 
 def setup_logging(log_level: str = 'INFO') -> None:
     """
@@ -22,17 +231,40 @@ def setup_logging(log_level: str = 'INFO') -> None:
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
     """
+    # Already configured (e.g. app module imported twice) - don't open another log file
+    if logging.getLogger().handlers:
+        return
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if not os.getenv('FLASK_DEBUG'):
+        handlers.append(logging.FileHandler('AIPlaygroundCode/app.log'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Request threads only enqueue records; a background listener does the I/O
+    queue_handler = QueueHandler(queue.Queue(-1))
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final layout is applied by the listener's handlers
+    _start_log_listener(queue_handler, handlers)
+    if hasattr(os, 'register_at_fork'):
+        # Threads don't survive fork (gunicorn --preload), so each worker starts its own listener
+        os.register_at_fork(after_in_child=lambda: _start_log_listener(queue_handler, handlers))
+    
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('AIPlaygroundCode/app.log') if not os.getenv('FLASK_DEBUG') else logging.NullHandler()
-        ]
+        handlers=[queue_handler]
     )
 
 
-def save_uploaded_file(file, upload_folder: str) -> Optional[str]:
+def _start_log_listener(queue_handler: QueueHandler, handlers: List[logging.Handler]) -> None:
+    """Start a listener thread writing queued log records to the real handlers."""
+    queue_handler.queue = queue.Queue(-1)
+    listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def save_uploaded_file(file: Optional[FileStorage], upload_folder: str) -> Optional[str]:
     """
     Safely save an uploaded file.
     
@@ -52,15 +284,15 @@ def save_uploaded_file(file, upload_folder: str) -> Optional[str]:
             return None
         
         filepath = os.path.join(upload_folder, filename)
-        file.save(filepath)
-        logger.info(f"File saved successfully: {filepath}")
+        file.save(filepath, buffer_size=_UPLOAD_BUFFER_SIZE)
+        logger.info("File saved successfully: %s", filepath)
         return filepath
     except Exception as e:
-        logger.error(f"Failed to save file: {e}")
+        logger.error("Failed to save file: %s", e)
         return None
 
 
-def _compress_conversation(conversation: List[Dict[str, str]]) -> str:
+def _compress_conversation(conversation: List[Dict[str, str]]) -> bytes:
     """
     Compress conversation history to reduce session size.
     
@@ -68,25 +300,42 @@ def _compress_conversation(conversation: List[Dict[str, str]]) -> str:
         conversation: List of message dictionaries
         
     Returns:
-        Compressed and base64 encoded conversation string
+        Compressed conversation bytes (text encoding is applied when writing to the session)
     """
     try:
-        # Convert to JSON and compress
-        json_str = json.dumps(conversation, separators=(',', ':'))
-        compressed = zlib.compress(json_str.encode('utf-8'))
-        encoded = base64.b64encode(compressed).decode('ascii')
-        return encoded
+        # Serialize (msgpack or JSON) and compress
+        if MSGPACK_AVAILABLE:
+            payload = _pack_conversation(conversation)
+        else:
+            payload = _json_dumps(conversation)
+        raw = (_RAW_MSGPACK_FORMAT if MSGPACK_AVAILABLE else _RAW_FORMAT) + payload
+        if len(payload) < _MIN_COMPRESS_BYTES:
+            return raw
+        zdict = _CONTENT_DICT if MSGPACK_AVAILABLE else _JSON_CONVERSATION_DICT
+        if ZSTD_AVAILABLE:
+            compressor, _ = _zstd_contexts(zdict)
+            format_tag = _ZSTD_MSGPACK_FORMAT if MSGPACK_AVAILABLE else _ZSTD_FORMAT
+            compressed = format_tag + compressor.compress(payload)
+        else:
+            # Raw deflate primed with the conversation dictionary; the session
+            # cookie is already signed, so the zlib header and checksum are dropped.
+            # memLevel 5 shrinks the hash tables 8x with no ratio loss on session-sized input
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15, 5, zlib.Z_DEFAULT_STRATEGY, zdict=zdict)
+            format_tag = _ZLIB_DICT_MSGPACK_FORMAT if MSGPACK_AVAILABLE else _ZLIB_DICT_FORMAT
+            compressed = format_tag + compressor.compress(payload) + compressor.flush()
+        # Never let compression grow the stored history
+        return compressed if len(compressed) < len(raw) else raw
     except Exception as e:
-        logger.error(f"Failed to compress conversation: {e}")
-        return ""
+        logger.error("Failed to compress conversation: %s", e)
+        return b""
 
 
-def _decompress_conversation(compressed_data: str) -> List[Dict[str, str]]:
+def _decompress_conversation(compressed_data: bytes) -> List[Dict[str, str]]:
     """
-    Decompress conversation history from session.
+    Decompress conversation history.
     
     Args:
-        compressed_data: Compressed and base64 encoded conversation string
+        compressed_data: Compressed conversation bytes
         
     Returns:
         List of message dictionaries
@@ -95,16 +344,76 @@ def _decompress_conversation(compressed_data: str) -> List[Dict[str, str]]:
         if not compressed_data:
             return []
         
-        # Decode and decompress
-        decoded = base64.b64decode(compressed_data.encode('ascii'))
-        decompressed = zlib.decompress(decoded).decode('utf-8')
-        conversation = json.loads(decompressed)
-        return conversation if isinstance(conversation, list) else []
+        format_tag = compressed_data[:1]
+        zdict = _CONTENT_DICT if format_tag in _MSGPACK_FORMATS else _JSON_CONVERSATION_DICT
+        if format_tag in (_ZSTD_FORMAT, _ZSTD_MSGPACK_FORMAT):
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Conversation is zstd-compressed but zstandard is not installed")
+            _, decompressor = _zstd_contexts(zdict)
+            decompressed = decompressor.decompress(compressed_data[1:])
+        elif format_tag in (_ZLIB_DICT_FORMAT, _ZLIB_DICT_MSGPACK_FORMAT):
+            decompressor = zlib.decompressobj(-15, zdict=zdict)
+            decompressed = decompressor.decompress(compressed_data[1:]) + decompressor.flush()
+        elif format_tag in (_RAW_FORMAT, _RAW_MSGPACK_FORMAT):
+            decompressed = compressed_data[1:]
+        else:
+            # Legacy zlib stream
+            decompressed = zlib.decompress(compressed_data)
+        
+        if format_tag in _MSGPACK_FORMATS:
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Conversation is msgpack-encoded but msgpack is not installed")
+            conversation = _unpack_conversation(decompressed)
+        else:
+            conversation = _json_loads(decompressed)
+            if not isinstance(conversation, list):
+                return []
+            # Rebuild with shared key/role strings - JSON decoders allocate fresh ones per message
+            conversation = [{'role': sys.intern(message['role']), 'content': message['content']} for message in conversation]
+        return conversation
     except Exception as e:
-        logger.error(f"Failed to decompress conversation: {e}")
+        logger.error("Failed to decompress conversation: %s", e)
         return []
 
 
+def _server_side_session() -> bool:
+    """Whether sessions live server-side (Flask-Session) and hold the plain message list."""
+    return bool(current_app.config.get('SESSION_TYPE'))
+
+
+def _encode_session_blob(data: bytes) -> str:
+    """Prepare compressed bytes for the cookie session as tagged base85 text."""
+    # base85 costs 25% over the raw bytes versus 33% for base64, and its
+    # alphabet needs no escaping inside the JSON cookie payload
+    return _B85_TAG + b85encode(data).decode('ascii')
+
+
+def _decode_session_blob(encoded: str) -> List[Dict[str, str]]:
+    """
+    Decode a compressed session value back into messages.
+    
+    Args:
+        encoded: base85 (tagged) or base64 encoded compressed conversation string
+        
+    Returns:
+        List of message dictionaries
+    """
+    try:
+        if encoded.startswith(_B85_TAG):
+            decoded = b85decode(encoded[1:])
+        else:
+            decoded = _b64decode(encoded)
+    except (ValueError, TypeError) as e:
+        logger.error("Failed to decode conversation: %s", e)
+        return []
+    return _decompress_conversation(decoded)
+
+
+def _encoded_size(byte_length: int) -> int:
+    """Exact stored length of a compressed payload, without encoding it."""
+    return len(_B85_TAG) + byte_length + (byte_length + 3) // 4
+
+
 def _truncate_message_content(content: str, max_length: int = 8000) -> str:
     """
     Truncate message content if it's too long to keep session manageable.
@@ -120,8 +429,33 @@ def _truncate_message_content(content: str, max_length: int = 8000) -> str:
         return content
     
     # Truncate and add indicator
-    truncated = content[:max_length-100]  # Leave more room for indicator
-    return f"{truncated}...\n\n*[Response continued but truncated to manage session size]*"
+    return content[:max_length-100] + _TRUNC_SUFFIX  # Leave more room for indicator
+
+
+def _store_conversation(conversation: List[Dict[str, str]], compressed: Optional[bytes] = None) -> None:
+    """
+    Write conversation history to the session as a single compressed blob.
+    
+    Args:
+        conversation: List of message dictionaries
+        compressed: The conversation already compressed by the caller, if available
+    """
+    if compressed is None:
+        compressed = _compress_conversation(conversation)
+    blob = _encode_session_blob(compressed)
+    
+    # Clear the legacy format and store the blob, remembering its exact size so
+    # session size checks don't have to serialize the session
+    session.pop('conversation', None)
+    session['conversation_compressed'] = blob
+    summary_frame = session.get('conversation_summary')
+    session['_conv_compressed_len'] = len(blob) + (len(summary_frame) if summary_frame else 0)
+    session['has_conv'] = True
+    session.modified = True
+    
+    # Keep the decoded list for later reads in this request, keyed by the stored blob
+    g._conv_cache_key = blob
+    g._conv_cache = list(conversation)
 
 
 def get_conversation_history() -> List[Dict[str, str]]:
@@ -132,26 +466,42 @@ def get_conversation_history() -> List[Dict[str, str]]:
         List of message dictionaries with 'role' and 'content' keys
     """
     try:
-        # Try new compressed format first
+        # Server-side sessions hold the plain message list - nothing to decode
+        if _server_side_session():
+            messages = session.get('conversation_messages')
+            if messages is not None:
+                return list(messages)
+        
+        # Reuse the history already decoded during this request, as long as the
+        # stored blob is still the same object (every rewrite stores a new string)
         compressed_conv = session.get('conversation_compressed')
+        if compressed_conv is not None and g.get('_conv_cache_key') is compressed_conv:
+            return list(g._conv_cache)
+        
+        # Nothing has been stored yet - skip the decode path entirely (sessions written
+        # before has_conv existed only carry one of the stored-history keys)
+        if not session.get('has_conv') and not any(key in session for key in _HISTORY_KEYS):
+            return []
+        
+        # Compressed format (base85 blobs, and base64 blobs from earlier releases)
         if compressed_conv:
-            return _decompress_conversation(compressed_conv)
+            conversation = _decode_session_blob(compressed_conv)
+            g._conv_cache_key = compressed_conv
+            g._conv_cache = conversation
+            return list(conversation)
         
         # Fall back to legacy uncompressed format
         legacy_conv = session.get('conversation', [])
         if legacy_conv:
-            # Migrate to compressed format
-            session['conversation_compressed'] = _compress_conversation(legacy_conv)
-            session.pop('conversation', None)  # Remove legacy format
-            session.modified = True
+            # Migrate to compressed format (removes the legacy key)
+            _store_conversation(legacy_conv)
             return legacy_conv
         
         return []
     except RuntimeError as e:
-        logger.warning(f"Session access failed in get_conversation_history: {e}")
+        logger.warning("Session access failed in get_conversation_history: %s", e)
         
         # Check if we're in a Flask request context
-        from flask import has_request_context
         if has_request_context():
             # We're in a web request but session failed - log but return empty for graceful degradation
             logger.error("Session access failed during web request - returning empty conversation")
@@ -169,35 +519,44 @@ def add_to_conversation(role: str, content: str) -> None:
         content: Message content
     """
     try:
-        # Get current conversation and session size
+        # Get current conversation
         conversation = get_conversation_history()
-        current_session_size = _get_current_session_size()
         
         # Process content for multimodal scenarios (but don't truncate yet)
         processed_content = _process_multimodal_content_light(content)
         
         # Create new message
         new_message = {
-            'role': role,
+            'role': sys.intern(role),
             'content': processed_content
         }
         
-        # Apply intelligent session size management
-        conversation = _apply_intelligent_truncation(conversation, new_message, current_session_size)
+        if _server_side_session():
+            # No cookie limit server-side - store plain messages, capped by count
+            conversation.append(new_message)
+            session['conversation_messages'] = conversation[-_SERVER_SESSION_MAX_MESSAGES:]
+            for key in ('conversation', 'conversation_compressed', 'conversation_summary', '_conv_compressed_len'):
+                session.pop(key, None)
+            session['has_conv'] = True
+            return
         
-        # Store in compressed format
-        compressed_conv = _compress_conversation(conversation)
+        # Cookie session - apply intelligent session size management; the kept
+        # history comes back already compressed, with its exact stored size checked
+        conversation, compressed, summary_frame = _apply_intelligent_truncation(
+            conversation, new_message, session.get('conversation_summary')
+        )
         
-        # Clear legacy format and store compressed
-        session.pop('conversation', None)
-        session['conversation_compressed'] = compressed_conv
-        session.modified = True
+        # Store in compressed format
+        if summary_frame:
+            session['conversation_summary'] = summary_frame
+        else:
+            session.pop('conversation_summary', None)
+        _store_conversation(conversation, compressed)
             
     except RuntimeError as e:
-        logger.error(f"Session error in add_to_conversation: {e}")
+        logger.error("Session error in add_to_conversation: %s", e)
         
         # Check if we're in a Flask request context
-        from flask import has_request_context
         if has_request_context():
             # We're in a web request but session failed - this is a real error
             raise RuntimeError(f"Session storage failed during web request: {e}")
@@ -205,16 +564,119 @@ def add_to_conversation(role: str, content: str) -> None:
 
 
 def clear_conversation() -> None:
-    """Clear conversation history from session (both legacy and compressed formats)."""
+    """Clear conversation history from session (legacy, compressed and server-side formats)."""
     try:
         session.pop('conversation', None)  # Legacy format
-        session.pop('conversation_compressed', None)  # New compressed format
+        session.pop('conversation_compressed', None)  # Compressed format
+        session.pop('conversation_messages', None)  # Server-side format
+        session.pop('conversation_summary', None)
+        session.pop('_conv_compressed_len', None)
+        session.pop('has_conv', None)
         session.modified = True
+        g.pop('_conv_cache_key', None)
+        g.pop('_conv_cache', None)
     except RuntimeError:
         # Working outside request context - nothing to clear
         pass
 
 
+def get_conversation_summary() -> str:
+    """
+    Get the summary of earlier turns that were evicted from the conversation history.
+    
+    Returns:
+        Summary text suitable for a system message, or an empty string
+    """
+    try:
+        summary_frame = session.get('conversation_summary')
+    except RuntimeError:
+        return ""
+    if not summary_frame:
+        return ""
+    
+    summary = _decode_session_blob(summary_frame)
+    if not summary:
+        return ""
+    return f"Earlier in this conversation, the user asked about: {summary[0]['content']}"
+
+
+_SDK_CONFIG_ERROR_RESPONSE = (
+    "🔧 **Configuration Issue Detected**\n\n"
+    "There seems to be an issue with your Azure AI settings. This usually happens when:\n"
+    "• Azure endpoint or API key is empty or invalid\n"
+    "• Azure SDK version compatibility issue\n\n"
+    "**To fix this:**\n"
+    "1. Go to **Settings** page\n"
+    "2. Verify your **Azure Endpoint** is complete (should end with '/models')\n"
+    "3. Verify your **API Key** is properly set\n"
+    "4. Click **Test Config** to validate your connection\n"
+    "5. If issues persist, try refreshing the page\n\n"
+    "Need help? Check the Settings page for endpoint format examples."
+)
+
+_MISSING_CONFIG_ERROR_RESPONSE = (
+    "⚙️ **Azure Configuration Required**\n\n"
+    "Your Azure AI settings are not configured yet. To get started:\n\n"
+    "1. Go to the **Settings** page\n"
+    "2. Enter your **Azure AI Foundry Endpoint**\n"
+    "3. Enter your **Azure API Key**\n"
+    "4. Select your preferred **Model** (e.g., gpt-4.1)\n"
+    "5. Click **Save Settings**\n"
+    "6. Use **Test Config** to verify everything works\n\n"
+    "Once configured, you can start chatting!"
+)
+
+_AUTH_ERROR_RESPONSE = (
+    "🔐 **Authentication Error**\n\n"
+    "There's an issue with your Azure credentials:\n\n"
+    "• Your API key may be incorrect or expired\n"
+    "• Your endpoint may not match your subscription\n\n"
+    "**To fix this:**\n"
+    "1. Go to **Settings** page\n"
+    "2. Double-check your **API Key** (no extra spaces)\n"
+    "3. Verify your **Endpoint** URL is correct\n"
+    "4. Click **Test Config** to validate\n\n"
+    "If you recently regenerated keys, make sure to use the new one."
+)
+
+_MODEL_ERROR_RESPONSE = (
+    "🤖 **Model Configuration Issue**\n\n"
+    "The specified AI model is not available:\n\n"
+    "**To fix this:**\n"
+    "1. Go to **Settings** page\n"
+    "2. Check your **Model Name** (e.g., 'gpt-4.1', 'gpt-4o')\n"
+    "3. Make sure it matches your Azure deployment name\n"
+    "4. Click **Test Config** to validate\n\n"
+    "Common model names: gpt-4.1, gpt-4o, gpt-4o-mini"
+)
+
+# SDK exception types that identify the problem without inspecting the message
+_ERROR_TYPE_RESPONSES = (
+    (_AUTH_ERROR_TYPES, _AUTH_ERROR_RESPONSE),
+    (_NOT_FOUND_ERROR_TYPES, _MODEL_ERROR_RESPONSE),
+)
+
+# Known error patterns, checked in priority order (case-insensitive, so the
+# error text is never lowercased)
+_ERROR_RESPONSES = (
+    (re.compile(r"unexpected keyword argument 'endpoint'|session\.request\(\)", re.IGNORECASE), _SDK_CONFIG_ERROR_RESPONSE),
+    (re.compile(r"configuration not found|missing required azure configuration", re.IGNORECASE), _MISSING_CONFIG_ERROR_RESPONSE),
+    (re.compile(r"authentication|unauthorized", re.IGNORECASE), _AUTH_ERROR_RESPONSE),
+    (re.compile(r"\A(?=.*model)(?=.*(?:not found|does not exist))", re.IGNORECASE | re.DOTALL), _MODEL_ERROR_RESPONSE),
+)
+
+_UNEXPECTED_ERROR_RESPONSE = (
+    "⚠️ **Unexpected Issue**\n\n"
+    "I encountered an unexpected issue processing your request.\n\n"
+    "**Quick troubleshooting:**\n"
+    "1. Check the **Settings** page for any configuration issues\n"
+    "2. Try **Test Config** to verify your Azure connection\n"
+    "3. Refresh the page and try again\n"
+    "4. If the issue persists, check your internet connection\n\n"
+    "The system is designed to help you resolve configuration issues automatically."
+)
+
+
 def format_error_response(error: Exception) -> str:
     """
     Format error for user-friendly display.
@@ -225,78 +687,24 @@ def format_error_response(error: Exception) -> str:
     Returns:
         User-friendly error message
     """
-    logger.error(f"Error occurred: {error}")
-    error_str = str(error).lower()
-    
-    # Check for specific Azure SDK configuration issues
-    if "unexpected keyword argument 'endpoint'" in error_str or "session.request()" in error_str:
-        return (
-            "🔧 **Configuration Issue Detected**\n\n"
-            "There seems to be an issue with your Azure AI settings. This usually happens when:\n"
-            "• Azure endpoint or API key is empty or invalid\n"
-            "• Azure SDK version compatibility issue\n\n"
-            "**To fix this:**\n"
-            "1. Go to **Settings** page\n"
-            "2. Verify your **Azure Endpoint** is complete (should end with '/models')\n"
-            "3. Verify your **API Key** is properly set\n"
-            "4. Click **Test Config** to validate your connection\n"
-            "5. If issues persist, try refreshing the page\n\n"
-            "Need help? Check the Settings page for endpoint format examples."
-        )
+    logger.error("Error occurred: %s", error)
     
-    if "configuration not found" in error_str or "missing required azure configuration" in error_str:
-        return (
-            "⚙️ **Azure Configuration Required**\n\n"
-            "Your Azure AI settings are not configured yet. To get started:\n\n"
-            "1. Go to the **Settings** page\n"
-            "2. Enter your **Azure AI Foundry Endpoint**\n"
-            "3. Enter your **Azure API Key**\n"
-            "4. Select your preferred **Model** (e.g., gpt-4.1)\n"
-            "5. Click **Save Settings**\n"
-            "6. Use **Test Config** to verify everything works\n\n"
-            "Once configured, you can start chatting!"
-        )
+    # SDK exception types first - no need to render the error text
+    for error_types, response in _ERROR_TYPE_RESPONSES:
+        if isinstance(error, error_types):
+            return response
     
-    if "authentication" in error_str or "unauthorized" in error_str:
-        return (
-            "🔐 **Authentication Error**\n\n"
-            "There's an issue with your Azure credentials:\n\n"
-            "• Your API key may be incorrect or expired\n"
-            "• Your endpoint may not match your subscription\n\n"
-            "**To fix this:**\n"
-            "1. Go to **Settings** page\n"
-            "2. Double-check your **API Key** (no extra spaces)\n"
-            "3. Verify your **Endpoint** URL is correct\n"
-            "4. Click **Test Config** to validate\n\n"
-            "If you recently regenerated keys, make sure to use the new one."
-        )
-    
-    if "model" in error_str and ("not found" in error_str or "does not exist" in error_str):
-        return (
-            "🤖 **Model Configuration Issue**\n\n"
-            "The specified AI model is not available:\n\n"
-            "**To fix this:**\n"
-            "1. Go to **Settings** page\n"
-            "2. Check your **Model Name** (e.g., 'gpt-4.1', 'gpt-4o')\n"
-            "3. Make sure it matches your Azure deployment name\n"
-            "4. Click **Test Config** to validate\n\n"
-            "Common model names: gpt-4.1, gpt-4o, gpt-4o-mini"
-        )
+    # Check for known Azure SDK, configuration, auth and model issues
+    error_str = str(error)
+    for pattern, response in _ERROR_RESPONSES:
+        if pattern.search(error_str):
+            return response
     
     # Don't expose detailed error info in production unless debug mode
-    if os.getenv('FLASK_DEBUG', 'False').lower() == 'true':
+    if _debug_mode():
         return f"🔧 **Technical Error (Debug Mode)**\n\nError: {str(error)}\n\nCheck the Settings page to verify your configuration."
     else:
-        return (
-            "⚠️ **Unexpected Issue**\n\n"
-            "I encountered an unexpected issue processing your request.\n\n"
-            "**Quick troubleshooting:**\n"
-            "1. Check the **Settings** page for any configuration issues\n"
-            "2. Try **Test Config** to verify your Azure connection\n"
-            "3. Refresh the page and try again\n"
-            "4. If the issue persists, check your internet connection\n\n"
-            "The system is designed to help you resolve configuration issues automatically."
-        )
+        return _UNEXPECTED_ERROR_RESPONSE
 
 
 def validate_message_input(message: str) -> bool:
@@ -309,13 +717,12 @@ def validate_message_input(message: str) -> bool:
     Returns:
         bool: True if valid, False otherwise
     """
-    if not message or not message.strip():
-        return False
-    
-    if len(message.strip()) > 4000:  # Reasonable limit
+    # isspace() checks for a blank message without building a stripped copy
+    if not message or message.isspace():
         return False
     
-    return True
+    # Only strip when the raw message could be over the limit
+    return len(message) <= _MAX_MESSAGE_LENGTH or len(message.strip()) <= _MAX_MESSAGE_LENGTH
 
 
 def _process_multimodal_content(content: str) -> str:
@@ -329,7 +736,7 @@ def _process_multimodal_content(content: str) -> str:
         Processed content optimized for session storage
     """
     # Check if content contains multimodal indicators
-    if any(indicator in content.lower() for indicator in ['🎤 **audio', '🖼️ **image', 'data:image', 'input_audio']):
+    if _MULTIMODAL_RE.search(content):
         # For multimodal content, intelligently preserve important parts
         if '🎤 **audio' in content:
             # Preserve more audio information - only compress if very long
@@ -340,13 +747,13 @@ def _process_multimodal_content(content: str) -> str:
                 
                 for line in lines:
                     # Always preserve headers and metadata
-                    if any(key in line.lower() for key in ['**file**:', '**request**:', '**transcription**:', '**ai analysis**:', '**status**:']):
+                    if _AUDIO_HEADER_RE.search(line):
                         preserved_lines.append(line)
-                        transcription_section = '**transcription**:' in line.lower()
+                        transcription_section = bool(_TRANSCRIPTION_HEADER_RE.search(line))
                     # Preserve transcription content but compress if very long
                     elif transcription_section and line.strip() and not line.startswith('**'):
                         if len(line) > 300:
-                            preserved_lines.append(line[:300] + '...[full transcription available]')
+                            preserved_lines.append(line[:300] + _FULL_TRANSCRIPTION_SUFFIX)
                             transcription_section = False
                         else:
                             preserved_lines.append(line)
@@ -354,16 +761,16 @@ def _process_multimodal_content(content: str) -> str:
                     elif not line.startswith('*[') and line.strip():  # Skip metadata markers
                         preserved_lines.append(line)
                 
-                return '\n'.join(preserved_lines) + '\n\n*[Audio response optimized for session storage]*'
+                return '\n'.join(preserved_lines) + _AUDIO_OPTIMIZED_SUFFIX
             else:
                 # Content is reasonable size - keep as is
                 return content
         
-        elif '🖼️ **image' in content or 'analyzed the image' in content.lower():
+        elif '🖼️ **image' in content or _ANALYZED_IMAGE_RE.search(content):
             # For image content, remove base64 data but keep analysis
             processed = content.replace('data:image/jpeg;base64,', '[image]')
             if len(processed) > 800:  # More generous limit for image analysis
-                processed = processed[:800] + '...[image analysis continues]'
+                processed = processed[:800] + _IMAGE_CONTINUES_SUFFIX
             return processed
     
     # For regular content, use light processing to preserve more content
@@ -418,49 +825,52 @@ def _compress_multimodal_metadata(conversation: List[Dict[str, str]]) -> List[Di
             transcription_found = False
             
             for line in lines:
+                # Markers only ever start a line, so only the prefix is checked
+                stripped = line.lstrip()
+                
                 # Always keep file info and request
-                if any(key in line for key in ['**File**:', '**Request**:']):
+                if stripped.startswith(_FILE_REQ_PREFIXES):
                     essential_lines.append(line)
                 # Keep transcription but compress if too long
-                elif '**Transcription**:' in line or '**📝 Transcription**:' in line:
+                elif stripped.startswith(_TRANSCRIPTION_PREFIXES):
                     essential_lines.append(line)
                     transcription_found = True
                 elif transcription_found and line.strip() and not line.startswith('**'):
                     # This is transcription content - compress if needed
                     if len(line) > 200:
-                        compressed_line = line[:200] + '...[transcription continues]'
+                        compressed_line = line[:200] + _TRANSCRIPTION_CONTINUES_SUFFIX
                         essential_lines.append(compressed_line)
                         transcription_found = False  # Stop processing transcription
                     else:
                         essential_lines.append(line)
                 # Keep AI analysis but compress if needed  
-                elif any(key in line for key in ['**AI Analysis**:', '**🧠 AI Analysis**:']):
+                elif stripped.startswith(_ANALYSIS_PREFIXES):
                     essential_lines.append(line)
                 elif line.startswith('**') and 'analysis' in line.lower():
                     if len(line) > 150:
-                        compressed_line = line[:150] + '...[analysis continues]'
+                        compressed_line = line[:150] + _ANALYSIS_CONTINUES_SUFFIX
                         essential_lines.append(compressed_line)
                     else:
                         essential_lines.append(line)
                 # Keep status and completion indicators
-                elif any(indicator in line for indicator in ['✅ **Audio processed', '**Status**:', 'Audio processed using']):
+                elif stripped.startswith(_STATUS_PREFIXES):
                     essential_lines.append(line)
             
             # Preserve the essential structure but indicate compression
             content = '\n'.join(essential_lines)
             if len(content) > 600:  # Still too long
-                content = content[:600] + '\n\n*[Response compressed for session efficiency]*'
+                content = content[:600] + _RESPONSE_COMPRESSED_SUFFIX
         
         # Compress image content similarly
-        elif any(indicator in content.lower() for indicator in ['🖼️ **image', 'analyzed the image', 'image analysis']):
+        elif _IMAGE_CONTENT_RE.search(content):
             # Remove base64 image data references but preserve analysis
             content = content.replace('data:image/jpeg;base64,', '[image data]')
             if len(content) > 400:
-                content = content[:400] + '\n\n*[Image analysis compressed]*'
+                content = content[:400] + _IMAGE_COMPRESSED_SUFFIX
         
         # General content length management for non-multimodal content
         elif len(content) > 500:
-            content = content[:500] + '...[message truncated]'
+            content = content[:500] + _MESSAGE_TRUNCATED_SUFFIX
         
         compressed_conversation.append({
             'role': msg['role'],
@@ -478,84 +888,123 @@ def _get_current_session_size() -> int:
         Current session size in bytes
     """
     try:
-        from flask import session
-        # Calculate session size including Flask overhead
-        session_str = str(session)
-        return len(session_str.encode('utf-8'))
+        # Use the stored compressed length rather than serializing the session
+        return session.get('_conv_compressed_len', 0) + _SESSION_FIXED_OVERHEAD
     except RuntimeError:
         # Outside Flask request context
         return 0
 
 
-def _estimate_message_size(message: Dict[str, str]) -> int:
+def _summarize_turns(previous_summary: str, evicted: List[Dict[str, str]]) -> str:
     """
-    Estimate compressed size of a single message.
+    Fold evicted messages into the running summary of earlier context.
+    
+    Keeps the start of each evicted user turn (no model call involved) and caps
+    the result, dropping the oldest context first.
     
     Args:
-        message: Dictionary with 'role' and 'content' keys
+        previous_summary: Existing summary text (may be empty)
+        evicted: Messages being removed from the history, oldest first
         
     Returns:
-        Estimated compressed size in bytes
+        Updated summary text
     """
-    # Create a minimal conversation with just this message for size estimation
-    temp_conv = [message]
-    compressed = _compress_conversation(temp_conv)
-    return len(compressed.encode('utf-8'))
+    parts = [previous_summary] if previous_summary else []
+    parts.extend(
+        ' '.join(message['content'][:_SUMMARY_TURN_CHARS].split())
+        for message in evicted if message['role'] == 'user'
+    )
+    return _cap_summary(' | '.join(part for part in parts if part), _SUMMARY_MAX_CHARS)
+
 
+def _cap_summary(summary: str, max_chars: int) -> str:
+    """Drop the oldest summary parts (then characters) until the text fits `max_chars`."""
+    while len(summary) > max_chars and ' | ' in summary:
+        summary = summary.split(' | ', 1)[1]
+    return summary[-max_chars:] if max_chars > 0 else ""
 
-def _apply_intelligent_truncation(conversation: List[Dict[str, str]], new_message: Dict[str, str], current_session_size: int) -> List[Dict[str, str]]:
+
+def _build_summary_frame(previous_summary: str, evicted: List[Dict[str, str]]) -> Optional[str]:
+    """Summarize evicted messages and compress the result like the conversation history, within its reserve."""
+    summary = _summarize_turns(previous_summary, evicted)
+    while summary:
+        summary_frame = _encode_session_blob(_compress_conversation([{'role': 'system', 'content': summary}]))
+        if len(summary_frame) <= _SUMMARY_RESERVE:
+            return summary_frame
+        # Text that compresses poorly (e.g. non-ASCII) can overflow the reserve - shorten and retry
+        summary = _cap_summary(summary, len(summary) - _SUMMARY_TURN_CHARS // 2)
+    return None
+
+
+def _apply_intelligent_truncation(conversation: List[Dict[str, str]], new_message: Dict[str, str],
+                                  summary_frame: Optional[str] = None) -> Tuple[List[Dict[str, str]], bytes, Optional[str]]:
     """
     Apply intelligent truncation logic that removes old messages first.
     
     Strategy:
     1. Calculate if adding new message would exceed threshold
-    2. Remove oldest messages one by one until under threshold
+    2. Remove the fewest oldest messages that bring it under the threshold,
+       folding them into a short summary of earlier context
     3. If new message alone is too large, truncate it as last resort
     
+    Sizes are the exact stored length of the compressed history. The whole
+    history is compressed as one blob so messages share back-references. The
+    summary has its own reserve outside SESSION_LIMIT and is not counted here.
+    
     Args:
         conversation: Current conversation history
         new_message: New message to add
-        current_session_size: Current session size in bytes
+        summary_frame: Compressed summary of previously evicted turns, if any
         
     Returns:
-        Conversation list that fits within session limits
+        Conversation list, its compressed bytes and the summary frame, fitting within session limits
     """
     # Session size thresholds (leaving room for Flask overhead)
     SESSION_LIMIT = 3200  # Conservative limit for total session
     MESSAGE_OVERHEAD = 200  # Estimated Flask session overhead per message
     
-    # Add new message temporarily to test size
-    test_conversation = conversation + [new_message]
-    test_compressed = _compress_conversation(test_conversation)
-    estimated_session_size = current_session_size + len(test_compressed.encode('utf-8'))
+    candidate = conversation + [new_message]
+    compressed = _compress_conversation(candidate)
+    estimated_session_size = _encoded_size(len(compressed)) + MESSAGE_OVERHEAD
     
-    logger.debug(f"Session size check: current={current_session_size}, estimated_with_new={estimated_session_size}, limit={SESSION_LIMIT}")
+    logger.debug("Session size check: estimated_with_new=%d, limit=%d", estimated_session_size, SESSION_LIMIT)
     
     # If we're under the limit, no truncation needed
     if estimated_session_size <= SESSION_LIMIT:
         logger.debug("No truncation needed - under session limit")
-        return test_conversation
+        return candidate, compressed, summary_frame
     
     # Strategy 1: Remove old messages until we fit
-    logger.info(f"Session size ({estimated_session_size}) exceeds limit ({SESSION_LIMIT}). Removing old messages...")
+    logger.info("Session size (%d) exceeds limit (%d). Removing old messages...", estimated_session_size, SESSION_LIMIT)
     
-    working_conversation = conversation.copy()
-    messages_removed = 0
+    previous_summary = ""
+    if summary_frame:
+        decoded_summary = _decode_session_blob(summary_frame)
+        previous_summary = decoded_summary[0]['content'] if decoded_summary else ""
     
-    while len(working_conversation) > 0:
-        # Test if current conversation + new message fits
-        test_conv = working_conversation + [new_message]
-        test_compressed = _compress_conversation(test_conv)
-        test_size = len(test_compressed.encode('utf-8')) + MESSAGE_OVERHEAD
-        
-        if test_size <= SESSION_LIMIT:
-            logger.info(f"Truncation successful: removed {messages_removed} old messages, final size: {test_size}")
-            return test_conv
-        
-        # Remove the oldest message and try again
-        working_conversation.pop(0)
-        messages_removed += 1
-        logger.debug(f"Removed message {messages_removed}, remaining: {len(working_conversation)}")
+    def fit_after_removing(count: int) -> Optional[Tuple[List[Dict[str, str]], bytes]]:
+        """Compress the history without its `count` oldest messages; None if it still doesn't fit."""
+        kept = conversation[count:] + [new_message]
+        kept_compressed = _compress_conversation(kept)
+        size = _encoded_size(len(kept_compressed)) + MESSAGE_OVERHEAD
+        logger.debug("Without %d oldest messages: size %d", count, size)
+        return (kept, kept_compressed) if size <= SESSION_LIMIT else None
+    
+    # Binary search for the fewest removals that fit - the history shrinks as
+    # messages are removed, so a handful of compressions replaces one per message
+    best = None
+    low, high = 1, len(conversation)
+    while low <= high:
+        middle = (low + high) // 2
+        result = fit_after_removing(middle)
+        if result:
+            best, high = (middle, result), middle - 1
+        else:
+            low = middle + 1
+    if best:
+        messages_removed, (kept, kept_compressed) = best
+        logger.info("Truncation successful: removed %d old messages", messages_removed)
+        return kept, kept_compressed, _build_summary_frame(previous_summary, conversation[:messages_removed])
     
     # Strategy 2: All old messages removed, but new message is still too large
     logger.warning("New message alone exceeds session limit. Truncating message content.")
@@ -565,10 +1014,10 @@ def _apply_intelligent_truncation(conversation: List[Dict[str, str]], new_messag
     
     if len(new_message['content']) > max_content_size:
         truncated_content = new_message['content'][:max_content_size-100]
-        new_message['content'] = f"{truncated_content}..\n\n*[Response truncated - message too large for session storage]*"
-        logger.info(f"Truncated new message content to fit session limit: {len(new_message['content'])} chars")
+        new_message['content'] = truncated_content + _OVERSIZED_SUFFIX
+        logger.info("Truncated new message content to fit session limit: %d chars", len(new_message['content']))
     
-    return [new_message]
+    return [new_message], _compress_conversation([new_message]), _build_summary_frame(previous_summary, conversation)
 
 
 def _process_multimodal_content_light(content: str) -> str:
@@ -582,13 +1031,13 @@ def _process_multimodal_content_light(content: str) -> str:
     Returns:
         Lightly processed content
     """
-    # Remove base64 image data (can be very large)
-    if 'data:image/jpeg;base64,' in content:
-        content = content.replace('data:image/jpeg;base64,', '[image data removed]')
+    # Remove base64 image data (can be very large) - replace() is a single scan
+    # and hands back the same string when there is nothing to replace
+    content = content.replace('data:image/jpeg;base64,', '[image data removed]')
     
     # For very large content, apply minimal truncation as safety net
     if len(content) > 8000:  # Much more generous limit
-        content = content[:7900] + '..\n\n*[Content lightly truncated for session efficiency]*'
+        content = content[:7900] + _LIGHT_TRUNC_SUFFIX
     
     return content
 
@@ -8,9 +8,13 @@ best practices for production deployment.
 
 import logging
 import os
-from flask import Flask, render_template, request, session, jsonify, redirect, url_for
+import re
+import threading
+import time
+from functools import lru_cache
+from flask import Flask, render_template, request, session, jsonify, redirect, url_for, make_response
 import markdown
-from markupsafe import Markup
+from markupsafe import Markup, escape
 
 # Import configuration and utilities from AIPlaygroundCode
 from AIPlaygroundCode.config import app_config, get_model_config, update_model_config, is_configured
@@ -20,7 +24,8 @@ from AIPlaygroundCode.utils.helpers import (
     add_to_conversation, 
     clear_conversation,
     format_error_response,
-    validate_message_input
+    validate_message_input,
+    _get_current_session_size
 )
 
 # Import AI scenario modules from AIPlaygroundCode
@@ -40,11 +45,104 @@ app.config['PERMANENT_SESSION_LIFETIME'] = app_config.session_timeout
 setup_logging(app_config.log_level)
 logger = logging.getLogger(__name__)
 
-# Add markdown filter for message rendering
-@app.template_filter('markdown')
-def markdown_filter(text):
-    """Convert markdown text to HTML."""
+# Optional server-side sessions - lifts the ~4KB cookie limit so the
+# conversation is kept as a plain message list (no compression per request)
+if app_config.session_redis_url:
     try:
+        import redis
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(app_config.session_redis_url)
+        app.config['SESSION_PERMANENT'] = True  # expire with PERMANENT_SESSION_LIFETIME
+        Session(app)
+        logger.info("Using Redis server-side sessions")
+    except ImportError:
+        app.config.pop('SESSION_TYPE', None)
+        logger.warning("SESSION_REDIS_URL is set but Flask-Session/redis are not installed - using cookie sessions")
+
+# Only signed-cookie sessions are bound by the browser's ~4KB cookie limit
+_COOKIE_SESSIONS = not app.config.get('SESSION_TYPE')
+
+# Reply shown when required model settings are missing; only the list of
+# missing fields and the settings button hint vary per request
+_MISSING_CONFIG_TMPL = (
+    "❌ **Configuration Required**\n\n"
+    "The following settings are missing or empty:\n{missing_list}\n\n"
+    "Please configure these settings before sending messages:\n"
+    "1. Click the **⚙️ Settings** button{button_hint}\n"
+    "2. Fill in all required fields\n"
+    "3. Click **Save Settings**\n\n"
+    "📋 **Required Settings:**\n"
+    "- **Azure AI Endpoint**: Your Azure AI service endpoint URL\n"
+    "- **API Key**: Your Azure AI service API key\n"
+    "- **Model Name**: The AI model deployment name to use\n\n"
+    "Once all settings are configured, you can start chatting!"
+)
+
+
+# Text scenario handlers keyed by the form's scenario value
+_SCENARIO_HANDLERS = {
+    'chat': handle_chat_message,              # Default chat scenario
+    'reasoning': handle_reasoning_message,    # Advanced reasoning scenario
+    'structured': handle_structured_message,  # Structured output scenario
+}
+
+# Scenarios that require an uploaded file
+_MULTIMODAL_SCENARIOS = frozenset(('image', 'audio'))
+
+# Chat pages rendered directly in response to their POST (others redirect)
+_INLINE_CHAT_PAGES = {'index': 'retail_home.html'}
+
+# Upload form fields, in order of preference
+_UPLOAD_FIELDS = ('file', 'audio', 'image')
+
+
+# Endpoints reachable before Azure is configured (health reports the state itself)
+_SKIP_CONFIG_CHECK_ENDPOINTS = frozenset((
+    'configuration_error', 'static', 'settings', 'update_settings', 'health_check', 'liveness_check'
+))
+
+
+# Settings form fields and their defaults when absent from the POST
+_SETTINGS_FIELDS = {
+    # Basic Azure settings
+    'endpoint': '',
+    'api_key': '',
+    # Model settings
+    'model': '',
+    'audio_model': '',
+    'max_tokens': 1000,
+    'temperature': 0.7,
+    'system_message': '',
+    # Advanced features
+    'max_image_size': 5,
+    'max_audio_size': 10,
+    'reasoning_effort': 'medium',
+    'response_format': 'text',
+    'json_schema': '',
+    'schema_name': 'Response',
+}
+
+# Numeric settings parsed by the form accessor (malformed input falls back to the default)
+_SETTINGS_TYPES = {
+    'max_tokens': int,
+    'temperature': float,
+    'max_image_size': int,
+    'max_audio_size': int,
+}
+
+# Settings checkboxes (present in the form only when enabled)
+_SETTINGS_FLAGS = ('enable_multimodal', 'enable_reasoning', 'show_reasoning', 'enable_structured_output')
+
+
+# Markdown converters are built once per thread (they are stateful, so not shared)
+_markdown_local = threading.local()
+
+
+def _get_markdown():
+    """Return this thread's Markdown converter, creating it on first use."""
+    md = getattr(_markdown_local, 'md', None)
+    if md is None:
         # Configure markdown with extensions for better rendering
         md = markdown.Markdown(extensions=[
             'codehilite',  # For code syntax highlighting
@@ -52,10 +150,30 @@ def markdown_filter(text):
             'tables',       # For table support
             'toc'          # For table of contents
         ])
-        return Markup(md.convert(text))
+        _markdown_local.md = md
+    return md
+
+
+# **bold** spans for the plain-text fallback when markdown conversion fails
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+
+
+@lru_cache(maxsize=512)
+def _render_markdown(text: str) -> str:
+    """Convert markdown to HTML, memoized since each page re-renders the whole conversation."""
+    # reset() clears per-document state (e.g. toc, footnotes) between messages
+    return _get_markdown().reset().convert(text)
+
+
+# Add markdown filter for message rendering
+@app.template_filter('markdown')
+def markdown_filter(text):
+    """Convert markdown text to HTML."""
+    try:
+        return Markup(_render_markdown(text))
     except Exception as e:
         # Fallback to basic HTML escaping if markdown fails
-        return Markup(text.replace('\n', '<br>').replace('**', '<strong>').replace('**', '</strong>'))
+        return Markup(_BOLD_RE.sub(r'<strong>\1</strong>', str(escape(text))).replace('\n', '<br>'))
 
 
 @app.before_request
@@ -63,12 +181,13 @@ def check_configuration():
     """Ensure Azure configuration is available and manage session size."""
     # Enhanced session cleanup to prevent cookie size issues, especially for multimodal content
     try:
-        # Check if session is getting too large (browser cookie limit ~4KB)
-        session_size = len(str(session))
+        # Check if session is getting too large (browser cookie limit ~4KB).
+        # Uses the size tracked on conversation writes instead of repr-ing the session.
+        session_size = _get_current_session_size() if _COOKIE_SESSIONS else 0
         
-        # More aggressive cleanup for large sessions
+        # More aggressive cleanup for large sessions (cookie sessions only)
         if session_size > 3500:  # Lower threshold for earlier intervention
-            logger.warning(f"Large session detected ({session_size} bytes), performing cleanup")
+            logger.warning("Large session detected (%d bytes), performing cleanup", session_size)
             
             # Multi-level cleanup strategy
             cleanup_performed = False
@@ -82,31 +201,34 @@ def check_configuration():
             # Level 2: Clear compressed conversation backup
             if session_size > 3000 and 'conversation_compressed' in session:
                 session.pop('conversation_compressed', None)
+                session.pop('conversation_summary', None)
+                session.pop('_conv_compressed_len', None)
                 cleanup_performed = True
                 logger.info("Cleared compressed conversation from session")
             
             # Level 3: If still too large, keep only last 8 messages
             if session_size > 2500:
-                from AIPlaygroundCode.utils.helpers import get_conversation_history, _compress_conversation
+                from AIPlaygroundCode.utils.helpers import get_conversation_history, _store_conversation
                 conversation = get_conversation_history()
                 if len(conversation) > 8:
                     # Keep only last 8 messages (4 exchanges)
                     conversation = conversation[-8:]
-                    session['conversation_compressed'] = _compress_conversation(conversation)
+                    _store_conversation(conversation)
                     cleanup_performed = True
                     logger.info("Truncated conversation history to last 8 messages")
             
             if cleanup_performed:
                 session.modified = True
-                new_size = len(str(session))
-                logger.info(f"Session cleanup complete: {session_size} -> {new_size} bytes")
+                new_size = _get_current_session_size()
+                logger.info("Session cleanup complete: %d -> %d bytes", session_size, new_size)
             
     except Exception as e:
         # Don't let session cleanup break the request
-        logger.warning(f"Session cleanup failed: {e}")
+        logger.warning("Session cleanup failed: %s", e)
     
     # Check Azure configuration
-    if not is_configured() and request.endpoint not in ['configuration_error', 'static', 'settings', 'update_settings']:
+    # Endpoint test first so exempt pages never evaluate the configuration
+    if request.endpoint not in _SKIP_CONFIG_CHECK_ENDPOINTS and not is_configured():
         return redirect(url_for('configuration_error'))
 
 
@@ -121,13 +243,10 @@ def index():
     """Default popup chat interface for retail website integration."""
     try:
         conversation = get_conversation_history()
-        config = get_model_config()
         
-        return render_template(
-            'retail_home.html', 
-            conversation=conversation,
-            config=config.__dict__
-        )
+        # retail_home.html does not read the model config, so none is passed
+        # (this also keeps the API key out of the template context)
+        return render_template('retail_home.html', conversation=conversation)
     except Exception as e:
         return format_error_response(e), 500
 
@@ -135,13 +254,35 @@ def index():
 
 
 
-@app.route('/', methods=['POST'])
-def chat():
+def _chat_page_response(return_endpoint: str):
+    """
+    Answer a chat POST with the updated page.
+    
+    Pages listed in _INLINE_CHAT_PAGES are rendered directly instead of
+    redirecting, saving the browser a second request per message.
+    
+    Args:
+        return_endpoint: Endpoint of the page the message was posted from
+    """
+    template_name = _INLINE_CHAT_PAGES.get(return_endpoint)
+    if template_name is None:
+        return redirect(url_for(return_endpoint))
+    response = make_response(render_template(template_name, conversation=get_conversation_history()))
+    response.headers['Cache-Control'] = 'no-store'  # POST result - never reuse from cache
+    return response
+
+
+def _process_chat(return_endpoint: str, button_hint: str = ''):
     """
-    Handle popup chat messages with different AI scenarios.
+    Handle a chat form POST and redirect back to the originating page.
     
     Routes messages to appropriate scenario handlers based on 
     current configuration and message content.
+    
+    Args:
+        return_endpoint: Endpoint to redirect to once the reply is stored
+        button_hint: Where the Settings button is on that page, used in
+            the missing-configuration reply
     """
     try:
         # Check if Azure configuration is complete
@@ -163,41 +304,33 @@ def chat():
         
         if missing_configs:
             missing_list = "\n".join(f"- {item}" for item in missing_configs)
-            add_to_conversation('assistant', 
-                f"❌ **Configuration Required**\n\n"
-                f"The following settings are missing or empty:\n{missing_list}\n\n"
-                f"Please configure these settings before sending messages:\n"
-                f"1. Click the **⚙️ Settings** button in the top right\n"
-                f"2. Fill in all required fields\n"
-                f"3. Click **Save Settings**\n\n"
-                f"📋 **Required Settings:**\n"
-                f"- **Azure AI Endpoint**: Your Azure AI service endpoint URL\n"
-                f"- **API Key**: Your Azure AI service API key\n"
-                f"- **Model Name**: The AI model deployment name to use\n\n"
-                f"Once all settings are configured, you can start chatting!"
-            )
-            return redirect(url_for('index'))
+            add_to_conversation('assistant', _MISSING_CONFIG_TMPL.format(
+                missing_list=missing_list, button_hint=button_hint))
+            return _chat_page_response(return_endpoint)
         
         # Get and validate user message
         user_message = request.form.get('message', '').strip()
         
         if not validate_message_input(user_message):
-            return redirect(url_for('index'))
+            return _chat_page_response(return_endpoint)
         
         # Add user message to conversation
         add_to_conversation('user', user_message)
         
         # Determine scenario and route to appropriate handler
         scenario = request.form.get('scenario', 'chat')
-        uploaded_file = request.files.get('file') or request.files.get('audio') or request.files.get('image')
+        files = request.files
+        # FileStorage is falsy without a filename, so empty file inputs are skipped
+        uploaded_file = next(filter(None, map(files.get, _UPLOAD_FIELDS)), None) if files else None
         
         # Debug logging to see what files are received
-        logger.info(f"DEBUG - Request files: {list(request.files.keys())}")
-        logger.info(f"DEBUG - Form data keys: {list(request.form.keys())}")
-        logger.info(f"DEBUG - Scenario: {scenario}")
-        logger.info(f"DEBUG - Uploaded file: {uploaded_file.filename if uploaded_file else 'None'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request files: %s", list(request.files.keys()))
+            logger.debug("Form data keys: %s", list(request.form.keys()))
+            logger.debug("Scenario: %s", scenario)
+            logger.debug("Uploaded file: %s", uploaded_file.filename if uploaded_file else 'None')
         
-        if scenario in ['image', 'audio']:
+        if scenario in _MULTIMODAL_SCENARIOS:
             # Multimodal scenarios - require file upload
             if uploaded_file and uploaded_file.filename:
                 response = handle_multimodal_message(user_message, uploaded_file)
@@ -206,15 +339,9 @@ def chat():
         elif uploaded_file and uploaded_file.filename:
             # Multimodal scenario with file upload (legacy support)
             response = handle_multimodal_message(user_message, uploaded_file)
-        elif scenario == 'reasoning':
-            # Advanced reasoning scenario
-            response = handle_reasoning_message(user_message)
-        elif scenario == 'structured':
-            # Structured output scenario  
-            response = handle_structured_message(user_message)
         else:
-            # Default chat scenario
-            response = handle_chat_message(user_message)
+            # Text scenarios - unknown names fall back to the default chat scenario
+            response = _SCENARIO_HANDLERS.get(scenario, handle_chat_message)(user_message)
         
         # Add assistant response to conversation
         add_to_conversation('assistant', response)
@@ -223,93 +350,19 @@ def chat():
         error_message = format_error_response(e)
         add_to_conversation('assistant', error_message)
     
-    return redirect(url_for('index'))
+    return _chat_page_response(return_endpoint)
+
+
+@app.route('/', methods=['POST'])
+def chat():
+    """Handle popup chat messages with different AI scenarios."""
+    return _process_chat('index', button_hint=' in the top right')
 
 
 @app.route('/testing', methods=['POST'])
 def testing_chat_handler():
-    """
-    Handle detailed testing interface messages with different AI scenarios.
-    
-    Similar to main chat handler but returns to testing interface.
-    Routes messages to appropriate scenario handlers based on 
-    current configuration and message content.
-    """
-    try:
-        # Check if Azure configuration is complete
-        config = get_model_config()
-        missing_configs = []
-        
-        if not config.endpoint or not config.endpoint.strip():
-            missing_configs.append("Azure AI Endpoint")
-        
-        # Check if using Managed Identity
-        use_managed_identity = os.getenv('AZURE_CLIENT_ID') == 'system-assigned-managed-identity'
-        
-        # API key is only required when NOT using Managed Identity
-        if not use_managed_identity and (not config.api_key or not config.api_key.strip()):
-            missing_configs.append("API Key")
-        
-        if not config.model or not config.model.strip():
-            missing_configs.append("Model Name")
-        
-        if missing_configs:
-            missing_list = "\n".join(f"- {item}" for item in missing_configs)
-            add_to_conversation('assistant', 
-                f"❌ **Configuration Required**\n\n"
-                f"The following settings are missing or empty:\n{missing_list}\n\n"
-                f"Please configure these settings before sending messages:\n"
-                f"1. Click the **⚙️ Settings** button\n"
-                f"2. Fill in all required fields\n"
-                f"3. Click **Save Settings**\n\n"
-                f"📋 **Required Settings:**\n"
-                f"- **Azure AI Endpoint**: Your Azure AI service endpoint URL\n"
-                f"- **API Key**: Your Azure AI service API key\n"
-                f"- **Model Name**: The AI model deployment name to use\n\n"
-                f"Once all settings are configured, you can start chatting!"
-            )
-            return redirect(url_for('testing_interface'))
-        
-        # Get and validate user message
-        user_message = request.form.get('message', '').strip()
-        
-        if not validate_message_input(user_message):
-            return redirect(url_for('testing_interface'))
-        
-        # Add user message to conversation
-        add_to_conversation('user', user_message)
-        
-        # Determine scenario and route to appropriate handler
-        scenario = request.form.get('scenario', 'chat')
-        uploaded_file = request.files.get('file') or request.files.get('audio') or request.files.get('image')
-        
-        if scenario in ['image', 'audio']:
-            # Multimodal scenarios - require file upload
-            if uploaded_file and uploaded_file.filename:
-                response = handle_multimodal_message(user_message, uploaded_file)
-            else:
-                response = f"❌ **File Required for {scenario.title()} Analysis**\n\nPlease upload a {scenario} file to proceed with {scenario} analysis."
-        elif uploaded_file and uploaded_file.filename:
-            # Multimodal scenario with file upload (legacy support)
-            response = handle_multimodal_message(user_message, uploaded_file)
-        elif scenario == 'reasoning':
-            # Advanced reasoning scenario
-            response = handle_reasoning_message(user_message)
-        elif scenario == 'structured':
-            # Structured output scenario  
-            response = handle_structured_message(user_message)
-        else:
-            # Default chat scenario
-            response = handle_chat_message(user_message)
-        
-        # Add assistant response to conversation
-        add_to_conversation('assistant', response)
-        
-    except Exception as e:
-        error_message = format_error_response(e)
-        add_to_conversation('assistant', error_message)
-    
-    return redirect(url_for('testing_interface'))
+    """Handle detailed testing interface messages (returns to the testing interface)."""
+    return _process_chat('testing_interface')
 
 
 @app.route('/settings')
@@ -332,38 +385,16 @@ def settings():
 def update_settings():
     """Update all configuration settings."""
     try:
-        # Extract all form data
-        form_data = {}
-        
-        # Basic Azure settings
-        form_data['endpoint'] = request.form.get('endpoint', '').strip()
-        form_data['api_key'] = request.form.get('api_key', '').strip()
-        
-        # Model settings
-        form_data['model'] = request.form.get('model', '')
-        form_data['audio_model'] = request.form.get('audio_model', '')
-        form_data['max_tokens'] = request.form.get('max_tokens', 1000)
-        form_data['temperature'] = request.form.get('temperature', 0.7)
-        form_data['system_message'] = request.form.get('system_message', '')
-        
-        # Advanced features - multimodal
-        form_data['enable_multimodal'] = 'enable_multimodal' in request.form
-        form_data['max_image_size'] = request.form.get('max_image_size', 5)
-        form_data['max_audio_size'] = request.form.get('max_audio_size', 10)
-        
-        # Advanced features - reasoning
-        form_data['enable_reasoning'] = 'enable_reasoning' in request.form
-        form_data['reasoning_effort'] = request.form.get('reasoning_effort', 'medium')
-        form_data['show_reasoning'] = 'show_reasoning' in request.form
-        
-        # Advanced features - structured output
-        form_data['enable_structured_output'] = 'enable_structured_output' in request.form
-        form_data['response_format'] = request.form.get('response_format', 'text')
-        form_data['json_schema'] = request.form.get('json_schema', '')
-        form_data['schema_name'] = request.form.get('schema_name', 'Response')
+        # Extract all form data; checkboxes are only submitted when ticked
+        form = request.form
+        form_data = {key: form.get(key, default, type=_SETTINGS_TYPES.get(key))
+                     for key, default in _SETTINGS_FIELDS.items()}
+        form_data.update((flag, flag in form) for flag in _SETTINGS_FLAGS)
+        form_data['endpoint'] = form_data['endpoint'].strip()
+        form_data['api_key'] = form_data['api_key'].strip()
         
         # Validate required fields
-        if not form_data['endpoint'] or not form_data['endpoint'].strip():
+        if not form_data['endpoint']:
             session['settings_message'] = {
                 'type': 'error',
                 'text': 'Azure endpoint is required. Please enter your Azure AI Foundry endpoint URL.'
@@ -374,7 +405,7 @@ def update_settings():
         use_managed_identity = os.getenv('AZURE_CLIENT_ID') == 'system-assigned-managed-identity'
         
         # API key is only required when NOT using Managed Identity
-        if not use_managed_identity and (not form_data['api_key'] or not form_data['api_key'].strip()):
+        if not use_managed_identity and not form_data['api_key']:
             session['settings_message'] = {
                 'type': 'error',
                 'text': 'Azure API key is required when not using Managed Identity. Please enter your Azure AI Foundry API key or configure Managed Identity.'
@@ -411,8 +442,6 @@ def update_settings():
             'text': f'Error updating settings: {str(e)}'
         }
         return redirect(url_for('settings'))
-    
-    return redirect(url_for('settings'))
 
 
 @app.route('/debug_config')
@@ -496,23 +525,44 @@ def clear_testing_chat():
     return redirect(url_for('testing_interface'))
 
 
+# Last Azure connectivity result, reused by /health for _AZURE_HEALTH_TTL seconds
+_AZURE_HEALTH_TTL = 30
+_azure_health_cache = {'ts': float('-inf'), 'ok': False}
+
+
+def _cached_azure_connection() -> bool:
+    """Return the Azure connection test result, re-testing at most every _AZURE_HEALTH_TTL seconds."""
+    now = time.monotonic()
+    if now - _azure_health_cache['ts'] >= _AZURE_HEALTH_TTL:
+        from AIPlaygroundCode.utils.azure_client import test_azure_connection
+        _azure_health_cache['ok'] = test_azure_connection()
+        _azure_health_cache['ts'] = now
+    return _azure_health_cache['ok']
+
+
+@app.route('/health/live')
+def liveness_check():
+    """Liveness probe for App Service - no session or Azure access."""
+    return jsonify({'status': 'healthy'})
+
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for monitoring."""
     try:
-        from AIPlaygroundCode.utils.azure_client import test_azure_connection
-        
         # Check session size
-        session_size = len(str(session))
+        session_size = _get_current_session_size()
         conversation_count = len(get_conversation_history())
+        configured = is_configured()
         
         status = {
             'status': 'healthy',
-            'azure_configured': is_configured(),
-            'azure_connection': test_azure_connection() if is_configured() else False,
+            'azure_configured': configured,
+            'azure_connection': _cached_azure_connection() if configured else False,
             'session_size_bytes': session_size,
             'conversation_messages': conversation_count,
-            'session_healthy': session_size < 3500  # Well under 4093 limit
+            'session_healthy': session_size < 3500,  # Well under 4093 limit
+            'markdown_cache': _render_markdown.cache_info()._asdict()
         }
         
         return jsonify(status)
@@ -538,27 +588,49 @@ def reset_configuration():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# Example pages that ship with the app, resolved once at startup
+_EXAMPLE_SCENARIOS = frozenset(
+    name[len('examples/'):-len('_example.html')]
+    for name in app.jinja_loader.list_templates()
+    if name.startswith('examples/') and name.endswith('_example.html')
+)
+
+
 # Scenario-specific routes for examples
 @app.route('/examples/<scenario>')
 def scenario_example(scenario):
     """Display scenario-specific examples."""
+    # Unknown scenarios skip the template lookup (and its exception) entirely
+    if scenario not in _EXAMPLE_SCENARIOS:
+        return redirect(url_for('index'))
     try:
-        template_name = f'examples/{scenario}_example.html'
-        return render_template(template_name)
+        response = make_response(render_template(f'examples/{scenario}_example.html'))
     except Exception:
         return redirect(url_for('index'))
+    
+    # Example pages are static - let browsers and the edge reuse them
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# Error pages are static HTML, so render them once at startup
+with app.app_context():
+    _NOT_FOUND_PAGE = render_template('404.html')
+    _INTERNAL_ERROR_PAGE = render_template('500.html')
 
 
 @app.errorhandler(404)
 def not_found_error(error):
     """Handle 404 errors."""
-    return render_template('404.html'), 404
+    return _NOT_FOUND_PAGE, 404
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    return render_template('500.html'), 500
+    return _INTERNAL_ERROR_PAGE, 500
 
 
 if __name__ == '__main__':
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test Session Conversation History
+Replays a long conversation through the cookie session and checks how much history fits under the size budget
+
+Usage Examples:
+    python -m pytest tests/test_session_history.py
+"""
+
+import os
+import random
+import sys
+
+import pytest
+from flask import Flask, request
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from AIPlaygroundCode.utils import helpers
+
+WORDS = (
+    "the a to and of for with your our this that is are can you we it on in "
+    "Zava store paint brush roller color finish interior exterior wall primer "
+    "coat gallon room kitchen bathroom ceiling project recommend product price "
+    "stock delivery order return warranty customer matte gloss satin durable "
+    "washable drying time surface prep sanding tape drop cloth tools supplies"
+).split()
+
+# Turns replayed before the retained history is expected to have levelled off
+WARMUP_TURNS = 15
+TOTAL_TURNS = 40
+
+# Fewest messages the cookie session must keep once the budget is full; this
+# replay kept 18 at its lowest point before history compression was reworked
+MIN_RETAINED_MESSAGES = 18
+
+
+def _sentence(rnd, length):
+    """Build a deterministic sentence of roughly `length` characters."""
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rnd.choice(WORDS))
+    return ' '.join(words).capitalize() + '.'
+
+
+@pytest.fixture
+def client():
+    """Flask test client whose routes add turns to the cookie session history."""
+    app = Flask(__name__)
+    app.secret_key = 'test-secret'
+
+    @app.post('/turn')
+    def turn():
+        helpers.add_to_conversation('user', request.form['user'])
+        helpers.add_to_conversation('assistant', request.form['assistant'])
+        return str(len(helpers.get_conversation_history()))
+
+    return app.test_client()
+
+
+def _replay(client, seed=1):
+    """Replay a conversation and return the retained message count after each turn."""
+    rnd = random.Random(seed)
+    counts = []
+    for step in range(TOTAL_TURNS):
+        user = f"Question {step}: " + _sentence(rnd, rnd.randint(60, 160))
+        assistant = ' '.join(_sentence(rnd, rnd.randint(60, 120)) for _ in range(rnd.randint(3, 8)))
+        response = client.post('/turn', data={'user': user, 'assistant': assistant})
+        assert response.status_code == 200
+        counts.append(int(response.data))
+    return counts
+
+
+def _session_data(client):
+    """Decode the client's signed session cookie."""
+    app = client.application
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.loads(client.get_cookie('session').value)
+
+
+def test_history_kept_under_budget(client):
+    """Once the budget is full the session still keeps a useful amount of history."""
+    counts = _replay(client)
+    assert counts[:4] == [2, 4, 6, 8]
+    assert min(counts[WARMUP_TURNS:]) >= MIN_RETAINED_MESSAGES
+
+
+def test_summary_does_not_cost_history(client, monkeypatch):
+    """Evicted turns are summarized without losing any more recent turns."""
+    counts = _replay(client)
+    summary_frame = _session_data(client).get('conversation_summary')
+    assert summary_frame
+    assert len(summary_frame) <= helpers._SUMMARY_RESERVE
+    assert 'Question' in helpers._decode_session_blob(summary_frame)[0]['content']
+
+    # Same replay with summaries disabled keeps exactly the same history
+    monkeypatch.setattr(helpers, '_build_summary_frame', lambda previous_summary, evicted: None)
+    client.delete_cookie('session')
+    assert _replay(client) == counts
+
+
+def test_history_round_trips(client):
+    """The retained history reads back as the most recent turns, in order."""
+    _replay(client)
+    history = helpers._decode_session_blob(_session_data(client)['conversation_compressed'])
+    assert history[-2]['content'].startswith(f"Question {TOTAL_TURNS - 1}:")
+    assert [message['role'] for message in history[-2:]] == ['user', 'assistant']